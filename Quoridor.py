@@ -7,6 +7,7 @@
 #              won by that player.
 
 import os
+import traceback
 import pygame as pg
 from pygame import color
 from pygame.constants import BLEND_MULT
@@ -45,6 +46,43 @@ def load_image(name, colorKey=None, scale=1):
     return image, image.get_rect()
 
 
+def print_board(board):
+    """Prints the given Board out at the terminal."""
+    column = 0
+    for row in range(10):
+        while column < 9:
+            if (column, row) in board.get_h_fence():
+                print(" _", end="")
+                column += 1
+            else:
+                print("  ", end="")
+                column += 1
+
+        if row == 9:
+            continue
+
+        print("\n", end="")
+        column = 0
+        while column < 10:
+            if (column, row) in board.get_v_fence():
+                print("|", end="")
+            else:
+                print(" ", end="")
+
+            player_positions = board.get_player_positions()
+            if (column, row) == player_positions[0]:
+                print("1", end="")
+            elif (column, row) == player_positions[1]:
+                print("2", end="")
+            elif column < 9:
+                print("+", end="")
+            column += 1
+
+        print("\n", end="")
+        column = 0
+    print("\n")
+
+
 class QuoridorGame:
     """Represents a Quoridor game that has a Board and two Players.
     Players take turns either moving or placing fences to block the
@@ -56,13 +94,26 @@ class QuoridorGame:
     composition.
     """
 
-    def __init__(self, board_size):
+    def __init__(self, board_size, channel=None, keyframe_interval=20):
         """Initializes the game Board, Players 1 and 2, sets it as
-        the first Player's turn."""
+        the first Player's turn. If a SpectatorChannel is given, every
+        state change is broadcast on it as a delta, with a full keyframe
+        published at the start and every keyframe_interval changes."""
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+
         self._P1 = Player(1)
         self._P2 = Player(2)
         self._Board = Board(board_size)
+        self._board_size = board_size
         self._player_turn = 1
+        self._channel = channel
+        self._keyframe_interval = keyframe_interval
+        self._sequence = 0
+        self._game_id = None
+        if channel is not None:
+            self._game_id = channel.start_game()
+            channel.publish(self.get_keyframe())
 
     def get_board(self):
         """Returns the Board."""
@@ -84,6 +135,51 @@ class QuoridorGame:
         """Sets turn to given Player."""
         self._player_turn = player
 
+    def get_fence_counts(self):
+        """Returns the fence counts of Players 1 and 2 as a tuple."""
+        return (self.get_p1().get_fence_count(), self.get_p2().get_fence_count())
+
+    def get_channel(self):
+        """Returns the SpectatorChannel the game broadcasts on, or None."""
+        return self._channel
+
+    def get_keyframe(self):
+        """Returns a keyframe event holding the full state of the game,
+        which a spectator can use to rebuild its Board from scratch."""
+        board = self.get_board()
+        return {
+            "type": "keyframe",
+            "game": self._game_id,
+            "seq": self._sequence,
+            "board_size": self._board_size,
+            "positions": tuple(board.get_player_positions()),
+            "v_fence": tuple(board.get_v_fence()),
+            "h_fence": tuple(board.get_h_fence()),
+            "turn": self.get_player_turn(),
+            "fences": self.get_fence_counts(),
+        }
+
+    def broadcast(self, action):
+        """Publishes a delta event for the given action on the game's
+        channel, followed by a keyframe every keyframe_interval deltas.
+        Does nothing if the game has no channel."""
+        if self._channel is None:
+            return
+
+        self._sequence += 1
+        self._channel.publish(
+            {
+                "type": "delta",
+                "game": self._game_id,
+                "seq": self._sequence,
+                "action": action,
+                "turn": self.get_player_turn(),
+                "fences": self.get_fence_counts(),
+            }
+        )
+        if self._sequence % self._keyframe_interval == 0:
+            self._channel.publish(self.get_keyframe())
+
     def move_pawn(self, player_num, coordinates):
         """Moves the given Player to the given coordinates on the Board, if
         it is a valid move. If move is forbidden or game has already won,
@@ -107,6 +203,7 @@ class QuoridorGame:
         else:
             self.set_player_turn(1)
 
+        self.broadcast(("move", player_num, coordinates))
         return True
 
     def place_fence(self, player_num, fence_type, coordinates):
@@ -142,6 +239,7 @@ class QuoridorGame:
         else:
             self.set_player_turn(1)
 
+        self.broadcast(("fence", player_num, fence_type, coordinates))
         return True
 
     def validate_fence_place(self, player_num, fence_type, coordinates):
@@ -410,40 +508,7 @@ class QuoridorGame:
 
     def print_board(self):
         """Prints the board out for debugging purposes."""
-        column = 0
-        board = self.get_board()
-        for row in range(10):
-            while column < 9:
-                if (column, row) in board.get_h_fence():
-                    print(" _", end="")
-                    column += 1
-                else:
-                    print("  ", end="")
-                    column += 1
-
-            if row == 9:
-                continue
-
-            print("\n", end="")
-            column = 0
-            while column < 10:
-                if (column, row) in board.get_v_fence():
-                    print("|", end="")
-                else:
-                    print(" ", end="")
-
-                player_positions = board.get_player_positions()
-                if (column, row) == player_positions[0]:
-                    print("1", end="")
-                elif (column, row) == player_positions[1]:
-                    print("2", end="")
-                elif column < 9:
-                    print("+", end="")
-                column += 1
-
-            print("\n", end="")
-            column = 0
-        print("\n")
+        print_board(self.get_board())
 
 
 class Board:
@@ -490,6 +555,14 @@ class Board:
         """Returns the list of horizontal fence coordinates."""
         return self._h_fence
 
+    def set_v_fence(self, fences):
+        """Sets the list of vertical fence coordinates."""
+        self._v_fence = list(fences)
+
+    def set_h_fence(self, fences):
+        """Sets the list of horizontal fence coordinates."""
+        self._h_fence = list(fences)
+
     def get_player_positions(self):
         """Returns the list of player positions."""
         return self._player_positions
@@ -552,11 +625,271 @@ class Player(pg.sprite.Sprite):
             self.rect.bottom = (FENCE_WIDTH + SPACE_HEIGHT) * (coordinates[1] + 1) - 5
 
 
+class SpectatorChannel:
+    """Represents a local publish/subscribe channel that a QuoridorGame
+    broadcasts its state changes on. Each move or fence placement is
+    published as a small delta event, and the game publishes a full
+    keyframe every so often. Every event carries the id of the game that
+    published it, so a channel can be reused for a new game.
+    This class is responsible for delivering events to its subscribers and
+    for keeping the latest keyframe and the deltas published after it, so
+    that spectators can join in the middle of a game."""
+
+    def __init__(self):
+        """Initializes the channel with no subscribers and no keyframe."""
+        self._subscribers = list()
+        self._keyframe = None
+        self._deltas = list()
+        self._game_count = 0
+
+    def start_game(self):
+        """Returns a new game id for a game that will publish on the
+        channel."""
+        self._game_count += 1
+        return self._game_count
+
+    def get_keyframe(self):
+        """Returns the latest keyframe published on the channel."""
+        return self._keyframe
+
+    def get_deltas(self):
+        """Returns the list of deltas published since the latest keyframe."""
+        return self._deltas
+
+    def subscribe(self, callback):
+        """Adds a callback that is called with every event published on the
+        channel. Returns the latest keyframe followed by the deltas published
+        since it, so the subscriber can catch up to the current state."""
+        self._subscribers.append(callback)
+        if self._keyframe is None:
+            return list()
+        return [self._keyframe] + self._deltas
+
+    def unsubscribe(self, callback):
+        """Removes a callback from the channel's subscribers."""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, event):
+        """Publishes an event to every subscriber. A keyframe replaces the
+        stored keyframe and clears the stored deltas. A subscriber whose
+        callback raises is unsubscribed and its traceback printed, so it
+        cannot stop the event from reaching the others or escape into the
+        game's move."""
+        if event["type"] == "keyframe":
+            self._keyframe = event
+            self._deltas = list()
+        else:
+            self._deltas.append(event)
+
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception:
+                print("Warning, dropped spectator after error:")
+                traceback.print_exc()
+                self.unsubscribe(callback)
+
+
+class Spectator:
+    """Represents a spectator watching a QuoridorGame through a
+    SpectatorChannel. The spectator keeps its own Board, which is rebuilt
+    from keyframes and updated by applying deltas in order.
+    This class is responsible for tracking the state of the game as seen
+    from the channel. If a delta is missed, the spectator waits for the next
+    keyframe before updating again. Subclasses can override on_update to
+    show the game each time the spectator's state changes."""
+
+    def __init__(self):
+        """Initializes the spectator with no channel. The Board, turn and
+        fence counts stay None until the first keyframe arrives."""
+        self._board = None
+        self._board_size = None
+        self._game_id = None
+        self._player_turn = None
+        self._fence_counts = None
+        self._sequence = None
+        self._channel = None
+
+    def get_board(self):
+        """Returns the spectator's copy of the Board, or None if no keyframe
+        has been received yet."""
+        return self._board
+
+    def get_player_turn(self):
+        """Returns player turn."""
+        return self._player_turn
+
+    def get_fence_counts(self):
+        """Returns the fence counts of Players 1 and 2 as a tuple."""
+        return self._fence_counts
+
+    def is_synced(self):
+        """Returns True if the spectator has applied a keyframe and has not
+        missed a delta since."""
+        return self._sequence is not None
+
+    def join(self, channel):
+        """Subscribes to the given channel and catches up to the current
+        state from its latest keyframe and deltas. on_update is called once
+        after catching up, rather than once for every event replayed."""
+        self._channel = channel
+        updated = False
+        for event in channel.subscribe(self.receive):
+            if self.apply_event(event):
+                updated = True
+        if updated:
+            self.on_update()
+
+    def leave(self):
+        """Unsubscribes from the channel the spectator has joined."""
+        if self._channel is not None:
+            self._channel.unsubscribe(self.receive)
+            self._channel = None
+
+    def receive(self, event):
+        """Applies an event from the channel and calls on_update if the
+        spectator's state was updated. Returns True if the state was
+        updated, otherwise returns False."""
+        updated = self.apply_event(event)
+        if updated:
+            self.on_update()
+        return updated
+
+    def on_update(self):
+        """Called after the spectator's state is updated. Does nothing
+        unless overridden."""
+        return
+
+    def apply_event(self, event):
+        """Applies an event to the spectator's state. A keyframe from a new
+        game is always applied. Returns True if the state was updated,
+        otherwise returns False."""
+        if event["game"] != self._game_id:
+            if event["type"] == "keyframe":
+                self.apply_keyframe(event)
+                return True
+            return False
+
+        if event["type"] == "keyframe":
+            # the keyframe for a delta already applied holds the same state
+            if self._sequence is not None and event["seq"] <= self._sequence:
+                return False
+            self.apply_keyframe(event)
+            return True
+
+        if self._sequence is None or event["seq"] <= self._sequence:
+            return False
+
+        # a delta was missed, wait for the next keyframe
+        if event["seq"] != self._sequence + 1:
+            self._sequence = None
+            return False
+
+        self.apply_delta(event)
+        return True
+
+    def apply_keyframe(self, keyframe):
+        """Rebuilds the spectator's state from a keyframe. A new Board is
+        made if the keyframe's board size differs from the current one."""
+        if self._board is None or self._board_size != keyframe["board_size"]:
+            self._board = Board(keyframe["board_size"])
+            self._board_size = keyframe["board_size"]
+
+        board = self.get_board()
+        board.set_player_positions(1, keyframe["positions"][0])
+        board.set_player_positions(2, keyframe["positions"][1])
+        board.set_v_fence(keyframe["v_fence"])
+        board.set_h_fence(keyframe["h_fence"])
+        self._game_id = keyframe["game"]
+        self._player_turn = keyframe["turn"]
+        self._fence_counts = keyframe["fences"]
+        self._sequence = keyframe["seq"]
+
+    def apply_delta(self, delta):
+        """Updates the spectator's state with the action of a delta."""
+        action = delta["action"]
+        board = self.get_board()
+        if action[0] == "move":
+            board.set_player_positions(action[1], action[2])
+        elif action[2] == "v":
+            board.get_v_fence().append(action[3])
+        else:
+            board.get_h_fence().append(action[3])
+
+        self._player_turn = delta["turn"]
+        self._fence_counts = delta["fences"]
+        self._sequence = delta["seq"]
+
+
+class TerminalSpectator(Spectator):
+    """Represents a spectator that prints the board at the terminal every
+    time its state is updated."""
+
+    def on_update(self):
+        """Prints the board, player turn and fence counts."""
+        print_board(self.get_board())
+        print(
+            "Turn: player {}  Fences: {} - {}".format(
+                self.get_player_turn(), *self.get_fence_counts()
+            )
+        )
+
+
+def draw_board(screen, board):
+    """Draws the cells and fences of the given Board on the screen."""
+    white = (255, 255, 255)
+
+    for coordinate in board.get_cells():
+        color = white
+        pg.draw.rect(
+            screen,
+            color,
+            [
+                (FENCE_WIDTH + SPACE_WIDTH) * coordinate[0] + FENCE_WIDTH,
+                (FENCE_WIDTH + SPACE_HEIGHT) * coordinate[1] + FENCE_WIDTH,
+                SPACE_WIDTH,
+                SPACE_HEIGHT,
+            ],
+        )
+
+    for coordinate in board.get_h_fence():
+        if coordinate[0] == 0:
+            color = BORDER_COLOR
+        else:
+            color = FENCE_COLOR
+        pg.draw.rect(
+            screen,
+            color,
+            [
+                (FENCE_WIDTH + SPACE_WIDTH) * coordinate[0] + FENCE_WIDTH,
+                (FENCE_WIDTH + SPACE_HEIGHT) * coordinate[1],
+                SPACE_WIDTH,
+                FENCE_WIDTH,
+            ],
+        )
+
+    for coordinate in board.get_v_fence():
+        if coordinate[1] == 0 or coordinate[1] == 9:
+            color = BORDER_COLOR
+        else:
+            color = FENCE_COLOR
+        pg.draw.rect(
+            screen,
+            color,
+            [
+                (FENCE_WIDTH + SPACE_WIDTH) * coordinate[0],
+                (FENCE_WIDTH + SPACE_HEIGHT) * coordinate[1] + FENCE_WIDTH,
+                FENCE_WIDTH,
+                SPACE_HEIGHT,
+            ],
+        )
+
+
 def main():
     """ """
     pg.init()
     black = (0, 0, 0)
-    white = (255, 255, 255)
 
     screen = pg.display.set_mode(WINDOW_SIZE, pg.SCALED)
     pg.display.set_caption("Quoridor")
@@ -566,7 +899,11 @@ def main():
     screen.blit(background, (0, 0))
     pg.display.flip()
 
-    game = QuoridorGame(BOARD_SIZE)
+    channel = SpectatorChannel()
+    game = QuoridorGame(BOARD_SIZE, channel)
+    spectator = Spectator()
+    spectator.join(channel)
+    terminal_spectator = None
     player_one = game.get_p1()
     player_two = game.get_p2()
     allsprites = pg.sprite.RenderPlain((player_one, player_two))
@@ -579,6 +916,14 @@ def main():
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 going = False
+            elif event.type == pg.KEYDOWN and event.key == pg.K_t:
+                # joins or leaves the game with a terminal viewer
+                if terminal_spectator is None:
+                    terminal_spectator = TerminalSpectator()
+                    terminal_spectator.join(channel)
+                else:
+                    terminal_spectator.leave()
+                    terminal_spectator = None
             elif event.type == pg.MOUSEBUTTONDOWN:
                 pos = pg.mouse.get_pos()
 
@@ -597,56 +942,12 @@ def main():
                 else:
                     flag = game.move_pawn(game.get_player_turn(), coordinates)
                     print(flag)
-                    if flag:
-                        if game.get_player_turn() == 2:
-                            player_one.update(coordinates, 1)
-                        else:
-                            player_two.update(coordinates, 2)
-
-        for coordinate in game.get_board().get_cells():
-            color = white
-            pg.draw.rect(
-                screen,
-                color,
-                [
-                    (FENCE_WIDTH + SPACE_WIDTH) * coordinate[0] + FENCE_WIDTH,
-                    (FENCE_WIDTH + SPACE_HEIGHT) * coordinate[1] + FENCE_WIDTH,
-                    SPACE_WIDTH,
-                    SPACE_HEIGHT,
-                ],
-            )
 
-        for coordinate in game.get_board().get_h_fence():
-            if coordinate[0] == 0:
-                color = BORDER_COLOR
-            else:
-                color = FENCE_COLOR
-            pg.draw.rect(
-                screen,
-                color,
-                [
-                    (FENCE_WIDTH + SPACE_WIDTH) * coordinate[0] + FENCE_WIDTH,
-                    (FENCE_WIDTH + SPACE_HEIGHT) * coordinate[1],
-                    SPACE_WIDTH,
-                    FENCE_WIDTH,
-                ],
-            )
-
-        for coordinate in game.get_board().get_v_fence():
-            if coordinate[1] == 0 or coordinate[1] == 9:
-                color = BORDER_COLOR
-            else:
-                color = FENCE_COLOR
-            pg.draw.rect(
-                screen,
-                color,
-                [
-                    (FENCE_WIDTH + SPACE_WIDTH) * coordinate[0],
-                    (FENCE_WIDTH + SPACE_HEIGHT) * coordinate[1] + FENCE_WIDTH,
-                    FENCE_WIDTH,
-                    SPACE_HEIGHT,
-                ],
-            )
+        # the window is drawn as a spectator of the game's channel
+        positions = spectator.get_board().get_player_positions()
+        player_one.update(positions[0], 1)
+        player_two.update(positions[1], 2)
+        draw_board(screen, spectator.get_board())
 
         allsprites.draw(screen)
         pg.display.flip()
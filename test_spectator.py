@@ -0,0 +1,179 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pg = pytest.importorskip("pygame")
+
+import Quoridor
+
+
+@pytest.fixture(autouse=True)
+def display():
+    pg.init()
+    pg.display.set_mode((1, 1))
+    yield
+    pg.quit()
+
+
+def play(game):
+    """Plays five accepted changes on the game."""
+    assert game.place_fence(1, "h", (4, 2))
+    assert game.move_pawn(2, (4, 7))
+    assert game.move_pawn(1, (4, 1))
+    assert game.place_fence(2, "v", (3, 5))
+    assert game.move_pawn(1, (3, 1))
+
+
+def assert_matches(spectator, game):
+    board = spectator.get_board()
+    assert board.get_player_positions() == game.get_board().get_player_positions()
+    assert board.get_v_fence() == game.get_board().get_v_fence()
+    assert board.get_h_fence() == game.get_board().get_h_fence()
+    assert spectator.get_player_turn() == game.get_player_turn()
+    assert spectator.get_fence_counts() == game.get_fence_counts()
+
+
+def test_spectator_joining_mid_game_matches_game():
+    channel = Quoridor.SpectatorChannel()
+    game = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel, keyframe_interval=3)
+    early = Quoridor.Spectator()
+    early.join(channel)
+    assert game.place_fence(1, "h", (4, 2))
+    assert game.move_pawn(2, (4, 7))
+    assert game.move_pawn(1, (4, 1))
+    assert game.place_fence(2, "v", (3, 5))
+
+    late = Quoridor.Spectator()
+    late.join(channel)
+    assert_matches(late, game)
+
+    assert game.move_pawn(1, (5, 1))
+    assert_matches(early, game)
+    assert_matches(late, game)
+
+
+def test_spectator_waits_for_keyframe_after_missed_delta():
+    channel = Quoridor.SpectatorChannel()
+    events = list()
+    channel.subscribe(events.append)
+    game = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel, keyframe_interval=3)
+    spectator = Quoridor.Spectator()
+    spectator.receive(channel.get_keyframe())
+    play(game)
+
+    deltas = [event for event in events if event["type"] == "delta"]
+    keyframe = [event for event in events if event["type"] == "keyframe"][-1]
+    assert keyframe["seq"] == 3
+    assert spectator.receive(deltas[0])
+    assert spectator.receive(deltas[2]) is False
+    assert not spectator.is_synced()
+    assert spectator.receive(deltas[3]) is False
+
+    assert spectator.receive(keyframe)
+    assert spectator.receive(deltas[3])
+    assert spectator.receive(deltas[4])
+    assert_matches(spectator, game)
+
+
+def test_spectator_skips_keyframe_for_applied_delta():
+    channel = Quoridor.SpectatorChannel()
+    game = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel, keyframe_interval=3)
+    spectator = Quoridor.Spectator()
+    spectator.join(channel)
+    updates = list()
+    channel.unsubscribe(spectator.receive)
+    channel.subscribe(
+        lambda event: updates.append((event["type"], spectator.receive(event)))
+    )
+    play(game)
+
+    # keyframe 3 holds the same state as delta 3, so it is not an update
+    assert updates == [
+        ("delta", True),
+        ("delta", True),
+        ("delta", True),
+        ("keyframe", False),
+        ("delta", True),
+        ("delta", True),
+    ]
+    assert_matches(spectator, game)
+
+
+def test_terminal_spectator_joining_mid_game_prints_once(capsys):
+    channel = Quoridor.SpectatorChannel()
+    game = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel)
+    play(game)
+    capsys.readouterr()
+
+    terminal = Quoridor.TerminalSpectator()
+    terminal.join(channel)
+    assert capsys.readouterr().out.count("Turn:") == 1
+    assert_matches(terminal, game)
+
+    assert game.move_pawn(2, (4, 6))
+    assert capsys.readouterr().out.count("Turn:") == 1
+
+
+def test_spectator_follows_new_game_on_reused_channel():
+    channel = Quoridor.SpectatorChannel()
+    first = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel)
+    spectator = Quoridor.Spectator()
+    spectator.join(channel)
+    assert first.move_pawn(1, (4, 1))
+    assert first.move_pawn(2, (4, 7))
+
+    second = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel)
+    assert_matches(spectator, second)
+    assert second.move_pawn(1, (3, 0))
+    assert_matches(spectator, second)
+
+
+def test_spectator_ignores_delta_from_other_game():
+    spectator = Quoridor.Spectator()
+    keyframe = {
+        "type": "keyframe",
+        "game": 2,
+        "seq": 0,
+        "board_size": Quoridor.BOARD_SIZE,
+        "positions": ((4, 0), (4, 8)),
+        "v_fence": (),
+        "h_fence": (),
+        "turn": 1,
+        "fences": (10, 10),
+    }
+    delta = {
+        "type": "delta",
+        "game": 1,
+        "seq": 1,
+        "action": ("move", 1, (4, 1)),
+        "turn": 2,
+        "fences": (10, 10),
+    }
+    assert spectator.receive(keyframe)
+    assert spectator.receive(delta) is False
+    assert spectator.is_synced()
+    assert spectator.get_board().get_player_positions() == [(4, 0), (4, 8)]
+
+
+def test_failing_subscriber_is_dropped(capsys):
+    channel = Quoridor.SpectatorChannel()
+    game = Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, channel)
+
+    def broken(event):
+        raise RuntimeError("spectator crashed")
+
+    channel.subscribe(broken)
+    spectator = Quoridor.Spectator()
+    spectator.join(channel)
+
+    assert game.move_pawn(1, (4, 1))
+    assert_matches(spectator, game)
+    assert game.move_pawn(2, (4, 7))
+    assert_matches(spectator, game)
+    assert "RuntimeError: spectator crashed" in capsys.readouterr().err
+
+
+def test_keyframe_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        Quoridor.QuoridorGame(Quoridor.BOARD_SIZE, keyframe_interval=0)